@@ -32,8 +32,8 @@ async def on_ready():
 
     # Initialize the database - critical for bot operation
     try:
-        database.init_database() 
-        message_count = database.get_message_count()
+        await database.init_database_async()
+        message_count = await database.get_message_count_async()
         logger.info(f'Database initialized successfully. Current message count: {message_count}')
     except Exception as e:
         logger.critical(f'Failed to initialize database: {str(e)}', exc_info=True)
@@ -199,3 +199,6 @@ except discord.LoginFailure:
     logger.critical("Invalid Discord token. Please check your token in config.py", exc_info=True)
 except Exception as e:
     logger.critical(f"Unexpected error during bot startup: {e}", exc_info=True)
+finally:
+    # Release pooled database connections once the client has stopped
+    database.close_connections()
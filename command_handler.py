@@ -79,7 +79,7 @@ async def handle_sum_command(message, client_user, start_date, end_date, summary
             await store_bot_response_db(bot_response, client_user, message.guild, message.channel, error_msg)
             return
 
-        messages_for_summary = database.get_channel_messages_for_timeframe(channel_id_str, start_date, end_date)
+        messages_for_summary = await database.get_channel_messages_for_timeframe_async(channel_id_str, start_date, end_date)
 
         if not messages_for_summary:
             await processing_msg.delete()
@@ -1,14 +1,22 @@
 """
 Database module for the Discord bot.
 Handles SQLite database operations for storing messages and channel summaries.
+
+The functions are synchronous. Coroutines should call the *_async wrappers at the
+end of the module, which run the blocking work in a worker thread.
 """
 
+import asyncio
 import sqlite3
 import os
 import logging
-import json
-from datetime import datetime, timedelta
-from typing import Optional, Dict, Any, List, Set
+import queue
+import threading
+import time
+import orjson
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Dict, Any, List, Set, Iterator, Tuple
 
 # Set up logging
 logger = logging.getLogger('discord_bot.database')
@@ -17,6 +25,64 @@ logger = logging.getLogger('discord_bot.database')
 DB_DIRECTORY = "data"
 DB_FILE = os.path.join(DB_DIRECTORY, "discord_messages.db")
 
+# Connection pool settings. SQLite only allows a single writer at a time, so all
+# writes share one connection guarded by a lock while reads use a small pool.
+READ_POOL_SIZE = 4
+
+# Seconds to wait for a free read connection before raising, so a leaked
+# checkout shows up as an error instead of a hang
+READ_POOL_TIMEOUT = 10
+
+# Number of prepared statements each pooled connection keeps cached. The SQL
+# statements below are module constants so repeated calls reuse the same entry.
+CACHED_STATEMENTS = 256
+
+# Number of rows fetched at a time when reading large result sets
+FETCH_BATCH_SIZE = 8192
+
+# Maximum number of rows removed per transaction when deleting old messages,
+# which keeps the WAL small and lets queued writes in between chunks
+DELETE_BATCH_SIZE = 10000
+
+# Deleting more rows than this refreshes the planner statistics for messages
+ANALYZE_AFTER_DELETE_THRESHOLD = 10000
+
+_read_pool: Optional[queue.Queue] = None
+_write_conn: Optional[sqlite3.Connection] = None
+_write_lock = threading.Lock()
+_pool_lock = threading.Lock()
+
+# Batched message writes. store_message() only enqueues rows; a background thread
+# inserts up to WRITE_BATCH_SIZE of them per transaction, waiting at most
+# WRITE_BATCH_INTERVAL seconds for a batch to fill up.
+WRITE_BATCH_SIZE = 500
+WRITE_BATCH_INTERVAL = 0.1
+
+# Transient write errors ("database is locked" or busy) are retried with exponential
+# backoff starting at WRITE_RETRY_DELAY seconds; after WRITE_RETRY_ATTEMPTS the batch
+# is dropped and logged. Other errors are retried row by row so one bad row only
+# loses itself.
+WRITE_RETRY_ATTEMPTS = 5
+WRITE_RETRY_DELAY = 0.5
+
+# How long flush_messages() waits for the background writer by default
+FLUSH_TIMEOUT = 30.0
+
+_write_queue: queue.Queue = queue.Queue()
+_flusher_thread: Optional[threading.Thread] = None
+_flusher_lock = threading.Lock()
+
+# Short-lived cache for aggregate queries whose results change slowly.
+# Entries map a (function name, *args) key to an (expiry time, result) pair.
+# The generation is bumped on every invalidation so a query that started before
+# a write doesn't cache its stale result afterwards.
+RESULT_CACHE_TTL = 30
+RESULT_CACHE_MAX_SIZE = 1024
+
+_result_cache: Dict[tuple, tuple] = {}
+_result_cache_generation = 0
+_result_cache_lock = threading.Lock()
+
 # SQL statements
 CREATE_MESSAGES_TABLE = """
 CREATE TABLE IF NOT EXISTS messages (
@@ -29,6 +95,7 @@ CREATE TABLE IF NOT EXISTS messages (
     guild_name TEXT,
     content TEXT NOT NULL,
     created_at TIMESTAMP NOT NULL,
+    created_at_us INTEGER,
     is_bot INTEGER NOT NULL,
     is_command INTEGER NOT NULL,
     command_type TEXT
@@ -52,19 +119,91 @@ CREATE TABLE IF NOT EXISTS channel_summaries (
 );
 """
 
+# Message counts maintained by triggers, so counting doesn't scan the messages table
+CREATE_AUTHOR_COUNTS_TABLE = """
+CREATE TABLE IF NOT EXISTS author_counts (
+    author_id TEXT PRIMARY KEY,
+    n INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+CREATE_TABLE_COUNTS_TABLE = """
+CREATE TABLE IF NOT EXISTS table_counts (
+    table_name TEXT PRIMARY KEY,
+    n INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+CREATE_TRIGGER_MESSAGE_INSERT = """
+CREATE TRIGGER IF NOT EXISTS trg_messages_insert AFTER INSERT ON messages
+BEGIN
+    INSERT INTO author_counts (author_id, n) VALUES (NEW.author_id, 1)
+        ON CONFLICT(author_id) DO UPDATE SET n = n + 1;
+    UPDATE table_counts SET n = n + 1 WHERE table_name = 'messages';
+END;
+"""
+
+CREATE_TRIGGER_MESSAGE_DELETE = """
+CREATE TRIGGER IF NOT EXISTS trg_messages_delete AFTER DELETE ON messages
+BEGIN
+    UPDATE author_counts SET n = n - 1 WHERE author_id = OLD.author_id;
+    DELETE FROM author_counts WHERE author_id = OLD.author_id AND n <= 0;
+    UPDATE table_counts SET n = n - 1 WHERE table_name = 'messages';
+END;
+"""
+
+# Seed the counters from the existing messages when the triggers are first installed
+BACKFILL_AUTHOR_COUNTS = """
+INSERT OR REPLACE INTO author_counts (author_id, n)
+SELECT author_id, COUNT(*) FROM messages GROUP BY author_id;
+"""
+BACKFILL_MESSAGE_TABLE_COUNT = """
+INSERT OR REPLACE INTO table_counts (table_name, n)
+SELECT 'messages', COUNT(*) FROM messages;
+"""
+
 CREATE_INDEX_AUTHOR = "CREATE INDEX IF NOT EXISTS idx_author_id ON messages (author_id);"
-CREATE_INDEX_CHANNEL = "CREATE INDEX IF NOT EXISTS idx_channel_id ON messages (channel_id);"
+CREATE_INDEX_CHANNEL_CREATED = "CREATE INDEX IF NOT EXISTS idx_channel_created_us ON messages (channel_id, created_at_us);"
+CREATE_INDEX_CREATED_CHANNEL = "CREATE INDEX IF NOT EXISTS idx_created_us_channel ON messages (created_at_us, channel_id);"
 CREATE_INDEX_GUILD = "CREATE INDEX IF NOT EXISTS idx_guild_id ON messages (guild_id);"
-CREATE_INDEX_CREATED = "CREATE INDEX IF NOT EXISTS idx_created_at ON messages (created_at);"
 CREATE_INDEX_COMMAND = "CREATE INDEX IF NOT EXISTS idx_is_command ON messages (is_command);"
 CREATE_INDEX_SUMMARY_CHANNEL = "CREATE INDEX IF NOT EXISTS idx_summary_channel_id ON channel_summaries (channel_id);"
 CREATE_INDEX_SUMMARY_DATE = "CREATE INDEX IF NOT EXISTS idx_summary_date ON channel_summaries (date);"
 
+# Indexes superseded by the composite created_at_us indexes above
+DROP_OBSOLETE_INDEXES = (
+    "DROP INDEX IF EXISTS idx_channel_id;",
+    "DROP INDEX IF EXISTS idx_created_at;",
+)
+
+# Migration for databases created before created_at_us existed. The backfill calls
+# back into _to_unix_micros() so old rows are converted exactly like new writes.
+ADD_COLUMN_CREATED_AT_US = "ALTER TABLE messages ADD COLUMN created_at_us INTEGER;"
+BACKFILL_CREATED_AT_US = """
+UPDATE messages
+SET created_at_us = iso_to_unix_micros(created_at)
+WHERE created_at_us IS NULL;
+"""
+SELECT_UNPARSED_CREATED_AT = "SELECT id, created_at FROM messages WHERE created_at_us IS NULL;"
+
+# journal_mode is persistent in the database file, so it only needs to be set once
+PRAGMA_JOURNAL_MODE = "PRAGMA journal_mode=WAL;"
+
+# Per-connection settings, applied every time a connection is opened
+CONNECTION_PRAGMAS = (
+    "PRAGMA synchronous=NORMAL;",
+    "PRAGMA temp_store=MEMORY;",
+    "PRAGMA cache_size=-64000;",
+    "PRAGMA mmap_size=268435456;",
+    "PRAGMA wal_autocheckpoint=1000;",
+)
+
+# Duplicate message IDs are skipped by SQLite instead of raising IntegrityError
 INSERT_MESSAGE = """
-INSERT INTO messages (
+INSERT OR IGNORE INTO messages (
     id, author_id, author_name, channel_id, channel_name,
-    guild_id, guild_name, content, created_at, is_bot, is_command, command_type
-) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?);
+    guild_id, guild_name, content, created_at, created_at_us, is_bot, is_command, command_type
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?);
 """
 
 INSERT_CHANNEL_SUMMARY = """
@@ -75,6 +214,144 @@ INSERT INTO channel_summaries (
 ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?);
 """
 
+SELECT_MESSAGE_COUNT = "SELECT n FROM table_counts WHERE table_name = 'messages'"
+
+SELECT_USER_MESSAGE_COUNT = "SELECT n FROM author_counts WHERE author_id = ?"
+
+SELECT_CHANNEL_MESSAGES_FOR_TIMEFRAME = """
+SELECT author_name, content, created_at_us, is_bot, is_command
+FROM messages
+WHERE channel_id = ? AND created_at_us BETWEEN ? AND ?
+ORDER BY created_at_us ASC
+"""
+
+SELECT_MESSAGES_FOR_TIME_RANGE = """
+SELECT
+    id, author_id, author_name, channel_id, channel_name,
+    guild_id, guild_name, content, created_at_us, is_bot, is_command
+FROM messages
+WHERE created_at_us BETWEEN ? AND ?
+ORDER BY channel_id, created_at_us ASC
+"""
+
+SELECT_ACTIVE_CHANNELS = """
+SELECT
+    channel_id,
+    channel_name,
+    guild_id,
+    guild_name,
+    COUNT(*) as message_count
+FROM messages
+WHERE created_at_us >= ?
+GROUP BY channel_id
+ORDER BY message_count DESC
+"""
+
+DELETE_MESSAGES_OLDER_THAN = """
+DELETE FROM messages
+WHERE rowid IN (SELECT rowid FROM messages WHERE created_at_us < ? LIMIT ?)
+"""
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+def _to_unix_micros(value: datetime) -> int:
+    """
+    Convert a datetime to integer microseconds since the Unix epoch.
+
+    Args:
+        value (datetime): The datetime to convert (naive values are local time)
+
+    Returns:
+        int: Microseconds since 1970-01-01 UTC
+    """
+    if value.tzinfo is None:
+        value = value.astimezone()
+    return (value - _EPOCH) // timedelta(microseconds=1)
+
+def _from_unix_micros(value: int) -> datetime:
+    """
+    Convert integer microseconds since the Unix epoch to a UTC datetime.
+
+    Args:
+        value (int): Microseconds since 1970-01-01 UTC
+
+    Returns:
+        datetime: The corresponding timezone-aware UTC datetime
+    """
+    return _EPOCH + timedelta(microseconds=value)
+
+def _iso_to_unix_micros(value: str) -> Optional[int]:
+    """
+    Convert a stored ISO 8601 created_at string to microseconds since the Unix epoch.
+    Registered as a SQL function for the created_at_us backfill.
+
+    Args:
+        value (str): The stored timestamp (values without an offset are local time)
+
+    Returns:
+        Optional[int]: Microseconds since 1970-01-01 UTC, or None if it can't be parsed
+    """
+    try:
+        return _to_unix_micros(datetime.fromisoformat(value))
+    except (TypeError, ValueError):
+        return None
+
+def _migrate_created_at_us(cursor: sqlite3.Cursor) -> None:
+    """
+    Add and backfill the integer created_at_us column on databases created before it existed.
+
+    Args:
+        cursor (sqlite3.Cursor): A cursor on the database being initialized
+    """
+    cursor.execute("PRAGMA table_info(messages)")
+    columns = {row[1] for row in cursor.fetchall()}
+    if 'created_at_us' in columns:
+        return
+
+    cursor.connection.create_function("iso_to_unix_micros", 1, _iso_to_unix_micros, deterministic=True)
+    cursor.execute(ADD_COLUMN_CREATED_AT_US)
+    cursor.execute(BACKFILL_CREATED_AT_US)
+    logger.info(f"Migrated {cursor.rowcount} messages to integer created_at_us timestamps")
+
+    # Rows whose created_at couldn't be parsed keep a NULL created_at_us and won't
+    # match any time range query, so make sure they don't go unnoticed
+    cursor.execute(SELECT_UNPARSED_CREATED_AT)
+    unparsed = cursor.fetchall()
+    if unparsed:
+        examples = ", ".join(f"{message_id} ({created_at!r})" for message_id, created_at in unparsed[:5])
+        logger.warning(f"Could not parse created_at for {len(unparsed)} messages, left created_at_us NULL: {examples}")
+
+def _create_message_counters(cursor: sqlite3.Cursor) -> None:
+    """
+    Create the trigger-maintained message counters, seeding them from the existing
+    messages the first time. The backfill and the triggers are created in the same
+    transaction so no message is counted twice or missed.
+
+    Args:
+        cursor (sqlite3.Cursor): A cursor on the database being initialized
+    """
+    cursor.execute(CREATE_AUTHOR_COUNTS_TABLE)
+    cursor.execute(CREATE_TABLE_COUNTS_TABLE)
+
+    cursor.execute("SELECT 1 FROM table_counts WHERE table_name = 'messages'")
+    if cursor.fetchone() is None:
+        cursor.execute(BACKFILL_AUTHOR_COUNTS)
+        cursor.execute(BACKFILL_MESSAGE_TABLE_COUNT)
+        logger.info("Initialized message counters from existing messages")
+
+    cursor.execute(CREATE_TRIGGER_MESSAGE_INSERT)
+    cursor.execute(CREATE_TRIGGER_MESSAGE_DELETE)
+
+def _apply_pragmas(conn: sqlite3.Connection) -> None:
+    """
+    Apply the per-connection PRAGMA settings to a freshly opened connection.
+
+    Args:
+        conn (sqlite3.Connection): The connection to configure
+    """
+    for pragma in CONNECTION_PRAGMAS:
+        conn.execute(pragma)
+
 def init_database() -> None:
     """
     Initialize the database by creating the necessary directory and tables.
@@ -89,16 +366,24 @@ def init_database() -> None:
         with sqlite3.connect(DB_FILE) as conn:
             cursor = conn.cursor()
 
+            # Switch to WAL so readers don't block the writer and commits avoid a full fsync
+            cursor.execute(PRAGMA_JOURNAL_MODE)
+            _apply_pragmas(conn)
+
             # Create tables and indexes
             cursor.execute(CREATE_MESSAGES_TABLE)
             cursor.execute(CREATE_CHANNEL_SUMMARIES_TABLE)
+            _migrate_created_at_us(cursor)
+            _create_message_counters(cursor)
 
             # Create indexes for messages table
             cursor.execute(CREATE_INDEX_AUTHOR)
-            cursor.execute(CREATE_INDEX_CHANNEL)
+            cursor.execute(CREATE_INDEX_CHANNEL_CREATED)
+            cursor.execute(CREATE_INDEX_CREATED_CHANNEL)
             cursor.execute(CREATE_INDEX_GUILD)
-            cursor.execute(CREATE_INDEX_CREATED)
             cursor.execute(CREATE_INDEX_COMMAND)
+            for statement in DROP_OBSOLETE_INDEXES:
+                cursor.execute(statement)
 
             # Create indexes for channel_summaries table
             cursor.execute(CREATE_INDEX_SUMMARY_CHANNEL)
@@ -111,22 +396,342 @@ def init_database() -> None:
         logger.error(f"Error initializing database: {str(e)}", exc_info=True)
         raise
 
-def get_connection() -> sqlite3.Connection:
+def _open_connection(read_only: bool = False) -> sqlite3.Connection:
     """
-    Get a connection to the SQLite database.
-    The connection supports context managers (with statements).
+    Open and configure a new connection to the SQLite database.
+
+    Args:
+        read_only (bool): Whether the connection should reject writes
 
     Returns:
-        sqlite3.Connection: A connection to the database.
+        sqlite3.Connection: A configured connection to the database.
     """
     try:
-        conn = sqlite3.connect(DB_FILE)
+        conn = sqlite3.connect(DB_FILE, check_same_thread=False, cached_statements=CACHED_STATEMENTS)
+        _apply_pragmas(conn)
+        if read_only:
+            conn.execute("PRAGMA query_only=ON;")
         conn.row_factory = sqlite3.Row  # This enables column access by name
         return conn
     except Exception as e:
         logger.error(f"Error connecting to database: {str(e)}", exc_info=True)
         raise
 
+def _ensure_pool() -> Tuple[queue.Queue, sqlite3.Connection]:
+    """
+    Create the shared write connection and the read connection pool on first use.
+
+    Returns:
+        Tuple[queue.Queue, sqlite3.Connection]: The current read pool and write connection.
+            Callers keep these references, so a concurrent close_connections() can't
+            swap them out from under a checkout.
+    """
+    global _read_pool, _write_conn
+
+    with _pool_lock:
+        if _read_pool is None:
+            write_conn = _open_connection()
+            read_pool = queue.Queue(maxsize=READ_POOL_SIZE)
+            for _ in range(READ_POOL_SIZE):
+                read_pool.put(_open_connection(read_only=True))
+
+            _write_conn = write_conn
+            _read_pool = read_pool
+            logger.debug(f"Opened database connection pool with {READ_POOL_SIZE} read connections")
+
+        return _read_pool, _write_conn
+
+@contextmanager
+def get_connection(write: bool = False) -> Iterator[sqlite3.Connection]:
+    """
+    Check out a pooled connection to the SQLite database.
+    Use as a context manager; the connection is returned to the pool on exit.
+
+    Args:
+        write (bool): Whether the connection will be used to modify the database.
+            Write connections are serialized and committed (or rolled back) on exit.
+
+    Yields:
+        sqlite3.Connection: A connection to the database.
+    """
+    read_pool, write_conn = _ensure_pool()
+
+    if write:
+        with _write_lock, write_conn:
+            yield write_conn
+        return
+
+    try:
+        conn = read_pool.get(timeout=READ_POOL_TIMEOUT)
+    except queue.Empty:
+        raise TimeoutError(f"Timed out after {READ_POOL_TIMEOUT}s waiting for a database read connection") from None
+
+    try:
+        yield conn
+    finally:
+        if conn.in_transaction:
+            conn.rollback()
+
+        with _pool_lock:
+            # If the pool was closed while this connection was checked out, close it
+            # here instead of returning it to a queue nothing references any more
+            if read_pool is _read_pool:
+                read_pool.put(conn)
+            else:
+                conn.close()
+
+def close_connections() -> None:
+    """
+    Flush pending messages and close every pooled connection.
+    Should be called when the bot shuts down. Read connections that are checked out
+    at that moment are closed when they are returned.
+    """
+    global _read_pool, _write_conn
+
+    flush_messages()
+
+    with _pool_lock:
+        if _read_pool is None:
+            return
+
+        while not _read_pool.empty():
+            _read_pool.get_nowait().close()
+
+        with _write_lock:
+            try:
+                # Let SQLite refresh planner statistics. Only the write connection can run
+                # it, since the read connections are query-only.
+                _write_conn.execute("PRAGMA optimize;")
+            except sqlite3.Error as e:
+                logger.warning(f"Error optimizing database before closing: {str(e)}")
+            finally:
+                _write_conn.close()
+
+        _read_pool = None
+        _write_conn = None
+
+    logger.info("Closed database connections")
+
+def _get_cached_result(key: tuple) -> Optional[Any]:
+    """
+    Look up an unexpired result in the query result cache.
+
+    Args:
+        key (tuple): The cache key, starting with the function name
+
+    Returns:
+        Optional[Any]: The cached result, or None if missing or expired
+    """
+    with _result_cache_lock:
+        entry = _result_cache.get(key)
+
+    if entry is None or entry[0] < time.monotonic():
+        return None
+    return entry[1]
+
+def _get_cache_generation() -> int:
+    """
+    Get the current cache generation. Read it before running a query and pass it
+    to _set_cached_result() so results that raced with a write are not cached.
+
+    Returns:
+        int: The current cache generation
+    """
+    with _result_cache_lock:
+        return _result_cache_generation
+
+def _set_cached_result(key: tuple, value: Any, generation: int) -> None:
+    """
+    Store a result in the query result cache for RESULT_CACHE_TTL seconds, unless
+    the cache has been invalidated since the query started.
+
+    Args:
+        key (tuple): The cache key, starting with the function name
+        value (Any): The result to cache
+        generation (int): The cache generation read before the query ran
+    """
+    now = time.monotonic()
+
+    with _result_cache_lock:
+        if generation != _result_cache_generation:
+            return
+
+        if len(_result_cache) >= RESULT_CACHE_MAX_SIZE:
+            expired = [k for k, (expires_at, _) in _result_cache.items() if expires_at < now]
+            for k in expired:
+                del _result_cache[k]
+            if len(_result_cache) >= RESULT_CACHE_MAX_SIZE:
+                _result_cache.clear()
+
+        _result_cache[key] = (now + RESULT_CACHE_TTL, value)
+
+def _invalidate_cached_results(*prefixes: tuple) -> None:
+    """
+    Drop entries from the query result cache. Clears the whole cache if no prefixes are given.
+
+    Args:
+        *prefixes (tuple): Key prefixes to drop, e.g. ('get_active_channels',) drops
+            the entries for every value of hours
+    """
+    global _result_cache_generation
+
+    with _result_cache_lock:
+        _result_cache_generation += 1
+
+        if not prefixes:
+            _result_cache.clear()
+            return
+
+        stale = [key for key in _result_cache if any(key[:len(prefix)] == prefix for prefix in prefixes)]
+        for key in stale:
+            del _result_cache[key]
+
+def _is_transient_write_error(error: sqlite3.Error) -> bool:
+    """
+    Check whether a write error can clear up on its own if the write is retried.
+
+    Args:
+        error (sqlite3.Error): The error raised by the write
+
+    Returns:
+        bool: True if the database was busy or locked, False otherwise
+    """
+    # The extended result code keeps the primary code in its lowest byte
+    return (getattr(error, 'sqlite_errorcode', 0) & 0xFF) in (sqlite3.SQLITE_BUSY, sqlite3.SQLITE_LOCKED)
+
+def _write_message_rows(batch: List[tuple]) -> int:
+    """
+    Insert queued messages one statement at a time, skipping rows that fail.
+    Used when a batch insert fails, so one bad row doesn't lose the whole batch.
+
+    Args:
+        batch (List[tuple]): Rows matching the INSERT_MESSAGE parameters
+
+    Returns:
+        int: The number of messages that were stored
+    """
+    stored = 0
+    with get_connection(write=True) as conn:
+        for row in batch:
+            try:
+                stored += conn.execute(INSERT_MESSAGE, row).rowcount
+            except sqlite3.Error as e:
+                logger.error(f"Error storing message {row[0]}, message was not stored: {str(e)}")
+    return stored
+
+def _write_message_batch(batch: List[tuple]) -> None:
+    """
+    Insert a batch of queued messages in a single transaction.
+    Messages whose ID is already stored are skipped. A busy or locked database is
+    retried with backoff; any other error falls back to inserting row by row.
+
+    Args:
+        batch (List[tuple]): Rows matching the INSERT_MESSAGE parameters
+    """
+    try:
+        for attempt in range(WRITE_RETRY_ATTEMPTS):
+            try:
+                with get_connection(write=True) as conn:
+                    stored = conn.executemany(INSERT_MESSAGE, batch).rowcount
+                break
+            except sqlite3.Error as e:
+                if not _is_transient_write_error(e):
+                    logger.warning(f"Error storing batch of {len(batch)} messages, retrying one by one: {str(e)}")
+                    stored = _write_message_rows(batch)
+                    break
+                if attempt == WRITE_RETRY_ATTEMPTS - 1:
+                    raise
+                delay = WRITE_RETRY_DELAY * 2 ** attempt
+                logger.warning(f"Error storing batch of {len(batch)} messages, retrying in {delay:.1f}s: {str(e)}")
+                time.sleep(delay)
+
+        if stored < len(batch):
+            # This could happen if we try to insert a message with the same ID twice,
+            # or if some rows failed in the row-by-row fallback
+            logger.warning(f"Skipped {len(batch) - stored} of {len(batch)} messages")
+        logger.debug(f"Stored batch of {stored} messages in database")
+    except Exception as e:
+        logger.error(f"Error storing batch of {len(batch)} messages, messages were not stored: {str(e)}", exc_info=True)
+    finally:
+        # Counts and active channels that include the new messages are now stale
+        _invalidate_cached_results(
+            ('get_message_count',),
+            ('get_active_channels',),
+            *{('get_user_message_count', row[1]) for row in batch}
+        )
+
+def _flush_loop() -> None:
+    """
+    Background worker that drains the message queue into the database in batches.
+    Besides rows, the queue carries threading.Event markers from flush_messages(),
+    which are set once every row queued before them has been written.
+    """
+    while True:
+        batch = []
+        flushed = None
+        item = _write_queue.get()
+        deadline = time.monotonic() + WRITE_BATCH_INTERVAL
+
+        while True:
+            if isinstance(item, threading.Event):
+                flushed = item
+                break
+            batch.append(item)
+            if len(batch) >= WRITE_BATCH_SIZE:
+                break
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = _write_queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+
+        if batch:
+            _write_message_batch(batch)
+        if flushed is not None:
+            flushed.set()
+
+def _ensure_flusher() -> None:
+    """
+    Start the background message writer thread if it is not already running.
+    """
+    global _flusher_thread
+
+    if _flusher_thread is not None and _flusher_thread.is_alive():
+        return
+
+    with _flusher_lock:
+        if _flusher_thread is not None and _flusher_thread.is_alive():
+            return
+
+        _flusher_thread = threading.Thread(target=_flush_loop, name="database-message-writer", daemon=True)
+        _flusher_thread.start()
+
+def flush_messages(timeout: float = FLUSH_TIMEOUT) -> bool:
+    """
+    Wait until every message queued so far has been written by the background writer.
+    Messages that can't be written are dropped and logged rather than retried forever.
+
+    Args:
+        timeout (float): Maximum number of seconds to wait
+
+    Returns:
+        bool: True if all queued messages were processed, False if the wait timed out
+    """
+    if _flusher_thread is None and _write_queue.empty():
+        return True
+
+    flushed = threading.Event()
+    _write_queue.put(flushed)
+    _ensure_flusher()
+
+    if not flushed.wait(timeout):
+        logger.warning(f"Timed out after {timeout}s waiting for queued messages to be written")
+        return False
+    return True
+
 def store_message(
     message_id: str,
     author_id: str,
@@ -143,6 +748,8 @@ def store_message(
 ) -> bool:
     """
     Store a message in the database.
+    The message is queued and written by a background thread in batches;
+    call flush_messages() to make sure it has been committed.
 
     Args:
         message_id (str): The Discord message ID
@@ -159,39 +766,38 @@ def store_message(
         command_type (Optional[str]): The type of command (if applicable)
 
     Returns:
-        bool: True if the message was stored successfully, False otherwise
+        bool: True if the message was queued successfully, False otherwise
     """
     try:
-        # Use context manager to ensure connection is properly closed
-        with get_connection() as conn:
-            cursor = conn.cursor()
-
-            cursor.execute(
-                INSERT_MESSAGE,
-                (
-                    message_id,
-                    author_id,
-                    author_name,
-                    channel_id,
-                    channel_name,
-                    guild_id,
-                    guild_name,
-                    content,
-                    created_at.isoformat(),
-                    1 if is_bot else 0,
-                    1 if is_command else 0,
-                    command_type
-                )
-            )
-
-            conn.commit()
-
-        logger.debug(f"Message {message_id} stored in database")
+        # Check the text fields up front; a value SQLite can't bind would otherwise
+        # only fail later in the background writer, after we've returned True
+        for name, value in (
+            ('message_id', message_id), ('author_id', author_id), ('author_name', author_name),
+            ('channel_id', channel_id), ('channel_name', channel_name), ('content', content),
+            ('guild_id', guild_id), ('guild_name', guild_name), ('command_type', command_type)
+        ):
+            if value is not None and not isinstance(value, str):
+                raise TypeError(f"{name} must be a string, got {type(value).__name__}")
+
+        _write_queue.put((
+            message_id,
+            author_id,
+            author_name,
+            channel_id,
+            channel_name,
+            guild_id,
+            guild_name,
+            content,
+            created_at.isoformat(),
+            _to_unix_micros(created_at),
+            1 if is_bot else 0,
+            1 if is_command else 0,
+            command_type
+        ))
+        _ensure_flusher()
+
+        logger.debug(f"Message {message_id} queued for storage in database")
         return True
-    except sqlite3.IntegrityError:
-        # This could happen if we try to insert a message with the same ID twice
-        logger.warning(f"Message {message_id} already exists in database")
-        return False
     except Exception as e:
         logger.error(f"Error storing message {message_id}: {str(e)}", exc_info=True)
         return False
@@ -203,13 +809,21 @@ def get_message_count() -> int:
     Returns:
         int: The number of messages
     """
+    cache_key = ('get_message_count',)
+    cached = _get_cached_result(cache_key)
+    if cached is not None:
+        return cached
+
+    generation = _get_cache_generation()
     try:
         with get_connection() as conn:
             cursor = conn.cursor()
 
-            cursor.execute("SELECT COUNT(*) FROM messages")
-            count = cursor.fetchone()[0]
+            cursor.execute(SELECT_MESSAGE_COUNT)
+            row = cursor.fetchone()
+            count = row[0] if row else 0
 
+        _set_cached_result(cache_key, count, generation)
         return count
     except Exception as e:
         logger.error(f"Error getting message count: {str(e)}", exc_info=True)
@@ -226,60 +840,106 @@ def get_user_message_count(user_id: str) -> int:
     Returns:
         int: The number of messages from the user
     """
+    cache_key = ('get_user_message_count', user_id)
+    cached = _get_cached_result(cache_key)
+    if cached is not None:
+        return cached
+
+    generation = _get_cache_generation()
     try:
         with get_connection() as conn:
             cursor = conn.cursor()
 
-            cursor.execute("SELECT COUNT(*) FROM messages WHERE author_id = ?", (user_id,))
-            count = cursor.fetchone()[0]
+            cursor.execute(SELECT_USER_MESSAGE_COUNT, (user_id,))
+            row = cursor.fetchone()
+            count = row[0] if row else 0
 
+        _set_cached_result(cache_key, count, generation)
         return count
     except Exception as e:
         logger.error(f"Error getting message count for user {user_id}: {str(e)}", exc_info=True)
         # Return 0 instead of -1 for consistency with other error cases
         return 0
 
+def _query_channel_messages_for_timeframe(conn: sqlite3.Connection, channel_id: str, start_date: datetime, end_date: datetime) -> Iterator[Dict[str, Any]]:
+    """
+    Yield the messages from a specific channel for a given timeframe using the given
+    connection, fetching FETCH_BATCH_SIZE rows at a time.
+
+    Args:
+        conn (sqlite3.Connection): The connection to query
+        channel_id (str): The Discord channel ID
+        start_date (datetime): The start date of the timeframe (naive values are local time)
+        end_date (datetime): The end date of the timeframe (naive values are local time)
+
+    Yields:
+        Dict[str, Any]: Each message as a dictionary, in chronological order
+    """
+    # Messages are stored with UTC epoch timestamps
+    start_us = _to_unix_micros(start_date)
+    end_us = _to_unix_micros(end_date)
+
+    cursor = conn.cursor()
+    cursor.row_factory = None
+
+    # Query messages for the channel within the UTC date range
+    cursor.execute(
+        SELECT_CHANNEL_MESSAGES_FOR_TIMEFRAME,
+        (channel_id, start_us, end_us)
+    )
+
+    while True:
+        rows = cursor.fetchmany(FETCH_BATCH_SIZE)
+        if not rows:
+            break
+
+        for author_name, content, created_at_us, is_bot, is_command in rows:
+            yield {
+                'author_name': author_name,
+                'content': content,
+                'created_at': _from_unix_micros(created_at_us),
+                'is_bot': bool(is_bot),
+                'is_command': bool(is_command)
+            }
+
+def iter_channel_messages_for_timeframe(channel_id: str, start_date: datetime, end_date: datetime) -> Iterator[Dict[str, Any]]:
+    """
+    Stream the messages from a specific channel for a given timeframe.
+    Only one batch of FETCH_BATCH_SIZE rows is held in memory at a time. The
+    iterator uses its own read-only connection rather than a pooled one, so a
+    partly consumed iterator can't starve other readers. The connection is closed
+    when the iterator is exhausted or closed.
+
+    Args:
+        channel_id (str): The Discord channel ID
+        start_date (datetime): The start date of the timeframe (naive values are local time)
+        end_date (datetime): The end date of the timeframe (naive values are local time)
+
+    Yields:
+        Dict[str, Any]: Each message as a dictionary, in chronological order
+    """
+    conn = _open_connection(read_only=True)
+    try:
+        yield from _query_channel_messages_for_timeframe(conn, channel_id, start_date, end_date)
+    finally:
+        conn.close()
+
 def get_channel_messages_for_timeframe(channel_id: str, start_date: datetime, end_date: datetime) -> List[Dict[str, Any]]:
     """
     Get all messages from a specific channel for a given timeframe.
 
     Args:
         channel_id (str): The Discord channel ID
-        start_date (datetime): The start date of the timeframe
-        end_date (datetime): The end date of the timeframe
+        start_date (datetime): The start date of the timeframe (naive values are local time)
+        end_date (datetime): The end date of the timeframe (naive values are local time)
 
     Returns:
         List[Dict[str, Any]]: A list of messages as dictionaries
     """
     try:
-        # Convert to UTC for database query (local is UTC-5)
-        start_date_utc = (start_date + timedelta(hours=5)).isoformat()
-        end_date_utc = (end_date + timedelta(hours=5)).isoformat()
-
+        # The rows are consumed before the pooled connection is returned
         with get_connection() as conn:
-            cursor = conn.cursor()
-
-            # Query messages for the channel within the UTC date range
-            cursor.execute(
-                """
-                SELECT author_name, content, created_at, is_bot, is_command
-                FROM messages
-                WHERE channel_id = ? AND created_at BETWEEN ? AND ?
-                ORDER BY created_at ASC
-                """,
-                (channel_id, start_date_utc, end_date_utc)
-            )
-
-            # Convert rows to dictionaries
-            messages = []
-            for row in cursor.fetchall():
-                messages.append({
-                    'author_name': row['author_name'],
-                    'content': row['content'],
-                    'created_at': datetime.fromisoformat(row['created_at']),
-                    'is_bot': bool(row['is_bot']),
-                    'is_command': bool(row['is_command'])
-                })
+            messages = list(_query_channel_messages_for_timeframe(conn, channel_id, start_date, end_date))
 
         logger.info(f"Retrieved {len(messages)} messages from channel {channel_id} for timeframe {start_date.strftime('%Y-%m-%d')} to {end_date.strftime('%Y-%m-%d')}")
         return messages
@@ -328,48 +988,51 @@ def get_messages_for_time_range(start_time: datetime, end_time: datetime) -> Dic
         Dict[str, List[Dict[str, Any]]]: A dictionary mapping channel_id to a list of messages
     """
     try:
-        start_date_str = start_time.isoformat()
-        end_date_str = end_time.isoformat()
+        start_us = _to_unix_micros(start_time)
+        end_us = _to_unix_micros(end_time)
 
         with get_connection() as conn:
+            # Plain tuples are cheaper to unpack than sqlite3.Row lookups by name
             cursor = conn.cursor()
+            cursor.row_factory = None
 
             # Query messages within the time range
             cursor.execute(
-                """
-                SELECT
-                    id, author_id, author_name, channel_id, channel_name,
-                    guild_id, guild_name, content, created_at, is_bot, is_command
-                FROM messages
-                WHERE created_at BETWEEN ? AND ?
-                ORDER BY channel_id, created_at ASC
-                """,
-                (start_date_str, end_date_str)
+                SELECT_MESSAGES_FOR_TIME_RANGE,
+                (start_us, end_us)
             )
 
-            # Group messages by channel
+            # Group messages by channel. Rows arrive ordered by channel, so the
+            # target list only needs to be looked up when the channel changes.
             messages_by_channel = {}
-            for row in cursor.fetchall():
-                channel_id = row['channel_id']
-
-                if channel_id not in messages_by_channel:
-                    messages_by_channel[channel_id] = {
-                        'channel_id': channel_id,
-                        'channel_name': row['channel_name'],
-                        'guild_id': row['guild_id'],
-                        'guild_name': row['guild_name'],
-                        'messages': []
-                    }
-
-                messages_by_channel[channel_id]['messages'].append({
-                    'id': row['id'],
-                    'author_id': row['author_id'],
-                    'author_name': row['author_name'],
-                    'content': row['content'],
-                    'created_at': datetime.fromisoformat(row['created_at']),
-                    'is_bot': bool(row['is_bot']),
-                    'is_command': bool(row['is_command'])
-                })
+            current_channel_id = None
+            channel_messages = None
+            while True:
+                rows = cursor.fetchmany(FETCH_BATCH_SIZE)
+                if not rows:
+                    break
+
+                for (message_id, author_id, author_name, channel_id, channel_name,
+                        guild_id, guild_name, content, created_at_us, is_bot, is_command) in rows:
+                    if channel_id != current_channel_id:
+                        current_channel_id = channel_id
+                        channel_messages = messages_by_channel.setdefault(channel_id, {
+                            'channel_id': channel_id,
+                            'channel_name': channel_name,
+                            'guild_id': guild_id,
+                            'guild_name': guild_name,
+                            'messages': []
+                        })['messages']
+
+                    channel_messages.append({
+                        'id': message_id,
+                        'author_id': author_id,
+                        'author_name': author_name,
+                        'content': content,
+                        'created_at': _from_unix_micros(created_at_us),
+                        'is_bot': bool(is_bot),
+                        'is_command': bool(is_command)
+                    })
 
         total_messages = sum(len(channel_data['messages']) for channel_data in messages_by_channel.values())
         logger.info(f"Retrieved {total_messages} messages from {len(messages_by_channel)} channels between {start_time} and {end_time}")
@@ -407,11 +1070,11 @@ def store_channel_summary(
         bool: True if the summary was stored successfully, False otherwise
     """
     try:
-        # Convert active_users list to JSON string
-        active_users_json = json.dumps(active_users)
+        # Convert active_users list to JSON string (decoded so the column stays TEXT)
+        active_users_json = orjson.dumps(active_users).decode()
 
         # Convert metadata to JSON string if provided
-        metadata_json = json.dumps(metadata) if metadata else None
+        metadata_json = orjson.dumps(metadata, option=orjson.OPT_NON_STR_KEYS).decode() if metadata else None
 
         # Format date as YYYY-MM-DD
         date_str = date.strftime('%Y-%m-%d')
@@ -419,7 +1082,7 @@ def store_channel_summary(
         # Current timestamp
         created_at = datetime.now().isoformat()
 
-        with get_connection() as conn:
+        with get_connection(write=True) as conn:
             cursor = conn.cursor()
 
             cursor.execute(
@@ -457,32 +1120,40 @@ def delete_messages_older_than(cutoff_time: datetime) -> int:
     Returns:
         int: The number of messages deleted
     """
+    count = 0
     try:
-        cutoff_time_str = cutoff_time.isoformat()
+        cutoff_us = _to_unix_micros(cutoff_time)
 
-        with get_connection() as conn:
-            cursor = conn.cursor()
+        # Delete in chunks, committing each one separately
+        while True:
+            with get_connection(write=True) as conn:
+                cursor = conn.cursor()
 
-            # First, count how many messages will be deleted
-            cursor.execute(
-                "SELECT COUNT(*) FROM messages WHERE created_at < ?",
-                (cutoff_time_str,)
-            )
-            count = cursor.fetchone()[0]
+                cursor.execute(
+                    DELETE_MESSAGES_OLDER_THAN,
+                    (cutoff_us, DELETE_BATCH_SIZE)
+                )
+                deleted = cursor.rowcount
 
-            # Then delete them
-            cursor.execute(
-                "DELETE FROM messages WHERE created_at < ?",
-                (cutoff_time_str,)
-            )
+                conn.commit()
 
-            conn.commit()
+            count += deleted
+            if deleted < DELETE_BATCH_SIZE:
+                break
+
+        # A large delete leaves the row-count statistics stale, which can mislead the planner
+        if count > ANALYZE_AFTER_DELETE_THRESHOLD:
+            with get_connection(write=True) as conn:
+                conn.execute("ANALYZE messages;")
+            logger.info("Updated query planner statistics for messages")
 
         logger.info(f"Deleted {count} messages older than {cutoff_time}")
         return count
     except Exception as e:
-        logger.error(f"Error deleting messages older than {cutoff_time}: {str(e)}", exc_info=True)
-        return 0
+        logger.error(f"Error deleting messages older than {cutoff_time} ({count} deleted before the error): {str(e)}", exc_info=True)
+        return count
+    finally:
+        _invalidate_cached_results()
 
 def get_active_channels(hours: int = 24) -> List[Dict[str, Any]]:
     """
@@ -494,28 +1165,23 @@ def get_active_channels(hours: int = 24) -> List[Dict[str, Any]]:
     Returns:
         List[Dict[str, Any]]: A list of active channels with their details
     """
+    cache_key = ('get_active_channels', hours)
+    cached = _get_cached_result(cache_key)
+    if cached is not None:
+        return [dict(channel) for channel in cached]
+
+    generation = _get_cache_generation()
     try:
         # Calculate the cutoff time
-        cutoff_time = (datetime.now() - timedelta(hours=hours)).isoformat()
+        cutoff_us = _to_unix_micros(datetime.now(timezone.utc) - timedelta(hours=hours))
 
         with get_connection() as conn:
             cursor = conn.cursor()
 
             # Query for active channels
             cursor.execute(
-                """
-                SELECT
-                    channel_id,
-                    channel_name,
-                    guild_id,
-                    guild_name,
-                    COUNT(*) as message_count
-                FROM messages
-                WHERE created_at >= ?
-                GROUP BY channel_id
-                ORDER BY message_count DESC
-                """,
-                (cutoff_time,)
+                SELECT_ACTIVE_CHANNELS,
+                (cutoff_us,)
             )
 
             # Convert rows to dictionaries
@@ -530,7 +1196,186 @@ def get_active_channels(hours: int = 24) -> List[Dict[str, Any]]:
                 })
 
         logger.info(f"Found {len(channels)} active channels in the last {hours} hours")
+        # Cache and return separate copies so callers can't modify the cached entry
+        _set_cached_result(cache_key, [dict(channel) for channel in channels], generation)
         return channels
     except Exception as e:
         logger.error(f"Error getting active channels for the last {hours} hours: {str(e)}", exc_info=True)
         return []
+
+# Async wrappers for use from the bot's event loop. store_message() doesn't need
+# one because it only enqueues the message for the background writer, and
+# get_connection() and iter_channel_messages_for_timeframe() hand out a connection
+# that has to stay on one thread, so they have none either.
+
+async def init_database_async() -> None:
+    """
+    Initialize the database in a worker thread. See init_database().
+    """
+    await asyncio.to_thread(init_database)
+
+async def close_connections_async() -> None:
+    """
+    Flush pending messages and close every pooled connection in a worker thread.
+    See close_connections().
+    """
+    await asyncio.to_thread(close_connections)
+
+async def flush_messages_async(timeout: float = FLUSH_TIMEOUT) -> bool:
+    """
+    Wait for queued messages to be written without blocking the event loop.
+    See flush_messages().
+
+    Args:
+        timeout (float): Maximum number of seconds to wait
+
+    Returns:
+        bool: True if all queued messages were processed, False if the wait timed out
+    """
+    return await asyncio.to_thread(flush_messages, timeout)
+
+async def get_message_count_async() -> int:
+    """
+    Get the total number of messages in the database in a worker thread.
+    See get_message_count().
+
+    Returns:
+        int: The number of messages
+    """
+    return await asyncio.to_thread(get_message_count)
+
+async def get_user_message_count_async(user_id: str) -> int:
+    """
+    Get the number of messages from a specific user in a worker thread.
+    See get_user_message_count().
+
+    Args:
+        user_id (str): The Discord user ID
+
+    Returns:
+        int: The number of messages from the user
+    """
+    return await asyncio.to_thread(get_user_message_count, user_id)
+
+async def get_channel_messages_for_timeframe_async(channel_id: str, start_date: datetime, end_date: datetime) -> List[Dict[str, Any]]:
+    """
+    Get all messages from a specific channel for a given timeframe in a worker thread.
+    See get_channel_messages_for_timeframe().
+
+    Args:
+        channel_id (str): The Discord channel ID
+        start_date (datetime): The start date of the timeframe (naive values are local time)
+        end_date (datetime): The end date of the timeframe (naive values are local time)
+
+    Returns:
+        List[Dict[str, Any]]: A list of messages as dictionaries
+    """
+    return await asyncio.to_thread(get_channel_messages_for_timeframe, channel_id, start_date, end_date)
+
+async def get_channel_messages_for_day_async(channel_id: str, date: datetime) -> List[Dict[str, Any]]:
+    """
+    Get all messages from a specific channel for a specific day in a worker thread.
+    See get_channel_messages_for_day().
+
+    Args:
+        channel_id (str): The Discord channel ID
+        date (datetime): The date to get messages for
+
+    Returns:
+        List[Dict[str, Any]]: A list of messages as dictionaries
+    """
+    return await asyncio.to_thread(get_channel_messages_for_day, channel_id, date)
+
+async def get_channel_messages_for_week_async(channel_id: str, start_date: datetime) -> List[Dict[str, Any]]:
+    """
+    Get all messages from a specific channel for a week in a worker thread.
+    See get_channel_messages_for_week().
+
+    Args:
+        channel_id (str): The Discord channel ID
+        start_date (datetime): The start date of the week
+
+    Returns:
+        List[Dict[str, Any]]: A list of messages as dictionaries
+    """
+    return await asyncio.to_thread(get_channel_messages_for_week, channel_id, start_date)
+
+async def get_messages_for_time_range_async(start_time: datetime, end_time: datetime) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Get all messages from all channels within a time range in a worker thread.
+    See get_messages_for_time_range().
+
+    Args:
+        start_time (datetime): The start time for the range
+        end_time (datetime): The end time for the range
+
+    Returns:
+        Dict[str, List[Dict[str, Any]]]: A dictionary mapping channel_id to a list of messages
+    """
+    return await asyncio.to_thread(get_messages_for_time_range, start_time, end_time)
+
+async def store_channel_summary_async(
+    channel_id: str,
+    channel_name: str,
+    date: datetime,
+    summary_text: str,
+    message_count: int,
+    active_users: List[str],
+    guild_id: Optional[str] = None,
+    guild_name: Optional[str] = None,
+    metadata: Optional[Dict[str, Any]] = None
+) -> bool:
+    """
+    Store a channel summary in a worker thread. See store_channel_summary().
+
+    Args:
+        channel_id (str): The Discord channel ID
+        channel_name (str): The name of the channel
+        date (datetime): The date of the summary
+        summary_text (str): The summary text
+        message_count (int): The number of messages summarized
+        active_users (List[str]): List of active user names
+        guild_id (Optional[str]): The Discord guild ID (if applicable)
+        guild_name (Optional[str]): The name of the guild (if applicable)
+        metadata (Optional[Dict[str, Any]]): Additional metadata for the summary
+
+    Returns:
+        bool: True if the summary was stored successfully, False otherwise
+    """
+    return await asyncio.to_thread(
+        store_channel_summary,
+        channel_id,
+        channel_name,
+        date,
+        summary_text,
+        message_count,
+        active_users,
+        guild_id,
+        guild_name,
+        metadata
+    )
+
+async def delete_messages_older_than_async(cutoff_time: datetime) -> int:
+    """
+    Delete messages older than the specified cutoff time in a worker thread.
+    See delete_messages_older_than().
+
+    Args:
+        cutoff_time (datetime): Messages older than this time will be deleted
+
+    Returns:
+        int: The number of messages deleted
+    """
+    return await asyncio.to_thread(delete_messages_older_than, cutoff_time)
+
+async def get_active_channels_async(hours: int = 24) -> List[Dict[str, Any]]:
+    """
+    Get channels with recent activity in a worker thread. See get_active_channels().
+
+    Args:
+        hours (int): Number of hours to look back for activity
+
+    Returns:
+        List[Dict[str, Any]]: A list of active channels with their details
+    """
+    return await asyncio.to_thread(get_active_channels, hours)
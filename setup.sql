@@ -12,6 +12,7 @@ CREATE TABLE IF NOT EXISTS messages (
     guild_name TEXT,
     content TEXT NOT NULL,
     created_at TIMESTAMP NOT NULL,
+    created_at_us INTEGER,
     is_bot INTEGER NOT NULL,
     is_command INTEGER NOT NULL,
     command_type TEXT
@@ -19,11 +20,38 @@ CREATE TABLE IF NOT EXISTS messages (
 
 -- Create indexes for messages table
 CREATE INDEX IF NOT EXISTS idx_author_id ON messages (author_id);
-CREATE INDEX IF NOT EXISTS idx_channel_id ON messages (channel_id);
+CREATE INDEX IF NOT EXISTS idx_channel_created_us ON messages (channel_id, created_at_us);
+CREATE INDEX IF NOT EXISTS idx_created_us_channel ON messages (created_at_us, channel_id);
 CREATE INDEX IF NOT EXISTS idx_guild_id ON messages (guild_id);
-CREATE INDEX IF NOT EXISTS idx_created_at ON messages (created_at);
 CREATE INDEX IF NOT EXISTS idx_is_command ON messages (is_command);
 
+-- Create message counters maintained by triggers
+CREATE TABLE IF NOT EXISTS author_counts (
+    author_id TEXT PRIMARY KEY,
+    n INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS table_counts (
+    table_name TEXT PRIMARY KEY,
+    n INTEGER NOT NULL DEFAULT 0
+);
+
+INSERT OR IGNORE INTO table_counts (table_name, n) VALUES ('messages', 0);
+
+CREATE TRIGGER IF NOT EXISTS trg_messages_insert AFTER INSERT ON messages
+BEGIN
+    INSERT INTO author_counts (author_id, n) VALUES (NEW.author_id, 1)
+        ON CONFLICT(author_id) DO UPDATE SET n = n + 1;
+    UPDATE table_counts SET n = n + 1 WHERE table_name = 'messages';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_messages_delete AFTER DELETE ON messages
+BEGIN
+    UPDATE author_counts SET n = n - 1 WHERE author_id = OLD.author_id;
+    DELETE FROM author_counts WHERE author_id = OLD.author_id AND n <= 0;
+    UPDATE table_counts SET n = n - 1 WHERE table_name = 'messages';
+END;
+
 -- Create channel_summaries table
 CREATE TABLE IF NOT EXISTS channel_summaries (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
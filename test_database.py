@@ -5,8 +5,12 @@ This script tests the database initialization and message storage functionality.
 
 import os
 import sys
+import time
+import sqlite3
 import logging
-from datetime import datetime
+import tempfile
+import unittest
+from datetime import datetime, timezone
 import database
 
 # Set up logging
@@ -19,6 +23,24 @@ logging.basicConfig(
 )
 logger = logging.getLogger('test_database')
 
+# The messages table as it was before created_at_us and the message counters were added
+BASELINE_MESSAGES_TABLE = """
+CREATE TABLE messages (
+    id TEXT PRIMARY KEY,
+    author_id TEXT NOT NULL,
+    author_name TEXT NOT NULL,
+    channel_id TEXT NOT NULL,
+    channel_name TEXT NOT NULL,
+    guild_id TEXT,
+    guild_name TEXT,
+    content TEXT NOT NULL,
+    created_at TIMESTAMP NOT NULL,
+    is_bot INTEGER NOT NULL,
+    is_command INTEGER NOT NULL,
+    command_type TEXT
+)
+"""
+
 def test_database_init():
     """Test database initialization"""
     logger.info("Testing database initialization...")
@@ -66,6 +88,9 @@ def test_message_storage():
         else:
             logger.error(f"Failed to store message {message_id}")
             return False
+
+        # Messages are written in batches by a background thread
+        database.flush_messages()
         
         # Get message count
         count = database.get_message_count()
@@ -80,6 +105,273 @@ def test_message_storage():
         logger.error(f"Message storage test failed: {str(e)}", exc_info=True)
         return False
 
+def test_batched_duplicate_messages():
+    """Test that a duplicate in a batch does not prevent the other messages from being stored"""
+    logger.info("Testing batched message storage with duplicates...")
+    try:
+        prefix = "batch_" + datetime.now().strftime("%Y%m%d%H%M%S%f")
+        before = database.get_message_count()
+
+        for message_id in (f"{prefix}_1", f"{prefix}_2", f"{prefix}_1", f"{prefix}_3"):
+            database.store_message(
+                message_id=message_id,
+                author_id="123456789",
+                author_name="Test User",
+                channel_id="987654321",
+                channel_name="test-channel",
+                content="This is a batched test message",
+                created_at=datetime.now()
+            )
+        database.flush_messages()
+
+        after = database.get_message_count()
+        if after - before != 3:
+            logger.error(f"Expected 3 new messages, found {after - before}")
+            return False
+
+        logger.info("Duplicate message was skipped and the rest of the batch was stored")
+        return True
+    except Exception as e:
+        logger.error(f"Batched message storage test failed: {str(e)}", exc_info=True)
+        return False
+
+def test_invalid_message_in_batch():
+    """Test that a message with an invalid field is rejected without losing the others"""
+    logger.info("Testing batched message storage with an invalid message...")
+    try:
+        prefix = "invalid_" + datetime.now().strftime("%Y%m%d%H%M%S%f")
+        before = database.get_message_count()
+
+        results = []
+        for i in range(5):
+            results.append(database.store_message(
+                message_id=f"{prefix}_{i}",
+                author_id="123456789",
+                author_name="Test User",
+                channel_id="987654321",
+                channel_name=["not", "a", "string"] if i == 2 else "test-channel",
+                content="This is a batched test message",
+                created_at=datetime.now()
+            ))
+
+        if not database.flush_messages():
+            logger.error("Timed out flushing queued messages")
+            return False
+
+        if results != [True, True, False, True, True]:
+            logger.error(f"Expected only the invalid message to be rejected, got {results}")
+            return False
+
+        after = database.get_message_count()
+        if after - before != 4:
+            logger.error(f"Expected 4 new messages, found {after - before}")
+            return False
+
+        logger.info("Invalid message was rejected and the rest of the batch was stored")
+        return True
+    except Exception as e:
+        logger.error(f"Invalid message storage test failed: {str(e)}", exc_info=True)
+        return False
+
+def check_message_counters(db_file):
+    """Return a description of how the message counters differ from COUNT(*), or None if they match"""
+    with sqlite3.connect(db_file) as conn:
+        total = conn.execute("SELECT COUNT(*) FROM messages").fetchone()[0]
+        counted_total = conn.execute("SELECT n FROM table_counts WHERE table_name = 'messages'").fetchone()[0]
+        per_author = dict(conn.execute("SELECT author_id, COUNT(*) FROM messages GROUP BY author_id"))
+        counted_per_author = dict(conn.execute("SELECT author_id, n FROM author_counts"))
+    conn.close()
+
+    if counted_total != total:
+        return f"table_counts has {counted_total} messages, COUNT(*) is {total}"
+    if counted_per_author != per_author:
+        return f"author_counts is {counted_per_author}, COUNT(*) per author is {per_author}"
+    return None
+
+def test_message_counters():
+    """Test that the message counters match COUNT(*) after backfill, inserts, duplicates and deletes"""
+    logger.info("Testing message counters...")
+    original_db_file = database.DB_FILE
+    original_delete_batch_size = database.DELETE_BATCH_SIZE
+    try:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            # Point the pool at a scratch database so the delete can't touch real data
+            database.close_connections()
+            database.DB_FILE = os.path.join(tmpdir, "counters.db")
+
+            # Existing messages are counted by the backfill when the counters are created
+            with sqlite3.connect(database.DB_FILE) as conn:
+                conn.execute(BASELINE_MESSAGES_TABLE)
+                conn.executemany(
+                    "INSERT INTO messages VALUES (?, ?, 'Test User', '2', 'test-channel', NULL, NULL, 'hi', ?, 0, 0, NULL)",
+                    [
+                        ('old_1', 'author_a', '2024-01-01T00:00:00+00:00'),
+                        ('old_2', 'author_a', '2024-01-01T00:01:00+00:00'),
+                        ('old_3', 'author_b', '2024-01-01T00:02:00+00:00'),
+                    ]
+                )
+            conn.close()
+            database.init_database()
+
+            problem = check_message_counters(database.DB_FILE)
+            if problem:
+                logger.error(f"After backfill: {problem}")
+                return False
+
+            # New messages, including duplicates that INSERT OR IGNORE skips
+            for message_id, author_id in (
+                ('new_1', 'author_a'), ('new_2', 'author_c'), ('new_1', 'author_a'),
+                ('old_3', 'author_b'), ('new_3', 'author_c'),
+            ):
+                database.store_message(
+                    message_id=message_id,
+                    author_id=author_id,
+                    author_name="Test User",
+                    channel_id="2",
+                    channel_name="test-channel",
+                    content="hi",
+                    created_at=datetime(2024, 6, 1, tzinfo=timezone.utc)
+                )
+            database.flush_messages()
+
+            problem = check_message_counters(database.DB_FILE)
+            if problem:
+                logger.error(f"After inserts: {problem}")
+                return False
+            if database.get_message_count() != 6 or database.get_user_message_count('author_c') != 2:
+                logger.error("Message counts don't include the new messages")
+                return False
+
+            # A small batch size makes the delete run in several chunks
+            database.DELETE_BATCH_SIZE = 2
+            deleted = database.delete_messages_older_than(datetime(2024, 3, 1, tzinfo=timezone.utc))
+            if deleted != 3:
+                logger.error(f"Expected 3 deleted messages, got {deleted}")
+                return False
+
+            problem = check_message_counters(database.DB_FILE)
+            if problem:
+                logger.error(f"After delete: {problem}")
+                return False
+            if database.get_user_message_count('author_b') != 0:
+                logger.error("author_b still has messages counted after the delete")
+                return False
+
+            database.close_connections()
+
+        logger.info("Message counters matched COUNT(*) throughout")
+        return True
+    except Exception as e:
+        logger.error(f"Message counter test failed: {str(e)}", exc_info=True)
+        return False
+    finally:
+        database.close_connections()
+        database.DB_FILE = original_db_file
+        database.DELETE_BATCH_SIZE = original_delete_batch_size
+        # Don't let counts cached from the scratch database leak into later tests
+        database._invalidate_cached_results()
+
+def test_day_query_in_local_timezone():
+    """Test that messages stored with UTC timestamps are matched against local day boundaries"""
+    logger.info("Testing day query under a non-UTC timezone...")
+    original_tz = os.environ.get('TZ')
+    try:
+        os.environ['TZ'] = 'America/New_York'
+        time.tzset()
+
+        prefix = "tz_" + datetime.now().strftime("%Y%m%d%H%M%S%f")
+        channel_id = prefix + "_channel"
+
+        # 2024-03-15 in New York (UTC-4) runs from 04:00 UTC that day to 04:00 UTC the next
+        timestamps = {
+            'before': datetime(2024, 3, 15, 3, 59, tzinfo=timezone.utc),
+            'start': datetime(2024, 3, 15, 4, 0, tzinfo=timezone.utc),
+            'end': datetime(2024, 3, 16, 3, 59, 59, tzinfo=timezone.utc),
+            'after': datetime(2024, 3, 16, 4, 0, tzinfo=timezone.utc),
+        }
+        for label, created_at in timestamps.items():
+            database.store_message(
+                message_id=f"{prefix}_{label}",
+                author_id="123456789",
+                author_name="Test User",
+                channel_id=channel_id,
+                channel_name="test-channel",
+                content=label,
+                created_at=created_at
+            )
+        database.flush_messages()
+
+        messages = database.get_channel_messages_for_day(channel_id, datetime(2024, 3, 15))
+        contents = [message['content'] for message in messages]
+        if contents != ['start', 'end']:
+            logger.error(f"Expected messages ['start', 'end'] for the local day, got {contents}")
+            return False
+
+        if messages[0]['created_at'] != timestamps['start']:
+            logger.error(f"Expected created_at {timestamps['start']}, got {messages[0]['created_at']}")
+            return False
+
+        logger.info("Day query used local day boundaries")
+        return True
+    except Exception as e:
+        logger.error(f"Timezone day query test failed: {str(e)}", exc_info=True)
+        return False
+    finally:
+        if original_tz is None:
+            os.environ.pop('TZ', None)
+        else:
+            os.environ['TZ'] = original_tz
+        time.tzset()
+
+def test_created_at_us_migration():
+    """Test that init_database() backfills created_at_us on a database created before it existed"""
+    logger.info("Testing created_at_us migration...")
+    original_db_file = database.DB_FILE
+    try:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            database.DB_FILE = os.path.join(tmpdir, "baseline.db")
+
+            with sqlite3.connect(database.DB_FILE) as conn:
+                conn.execute(BASELINE_MESSAGES_TABLE)
+                conn.executemany(
+                    "INSERT INTO messages VALUES (?, '1', 'Test User', '2', 'test-channel', NULL, NULL, 'hi', ?, 0, 0, NULL)",
+                    [
+                        ('naive', '2024-03-15T12:00:00.250000'),
+                        ('utc', '2024-03-15T12:00:00.250000+00:00'),
+                        ('garbage', 'not a timestamp'),
+                    ]
+                )
+            conn.close()
+
+            with unittest.TestCase().assertLogs('discord_bot.database', level='WARNING') as captured:
+                database.init_database()
+
+            with sqlite3.connect(database.DB_FILE) as conn:
+                migrated = dict(conn.execute("SELECT id, created_at_us FROM messages"))
+            conn.close()
+
+        # Offset-less values are local time, like naive datetimes passed to store_message()
+        expected = {
+            'naive': int(datetime(2024, 3, 15, 12).timestamp()) * 1_000_000 + 250_000,
+            'utc': int(datetime(2024, 3, 15, 12, tzinfo=timezone.utc).timestamp()) * 1_000_000 + 250_000,
+            'garbage': None,
+        }
+        if migrated != expected:
+            logger.error(f"Expected created_at_us {expected}, got {migrated}")
+            return False
+
+        if not any('garbage' in line for line in captured.output):
+            logger.error(f"Expected the unparseable message to be logged, got {captured.output}")
+            return False
+
+        logger.info("created_at_us was backfilled and the unparseable message was logged")
+        return True
+    except Exception as e:
+        logger.error(f"created_at_us migration test failed: {str(e)}", exc_info=True)
+        return False
+    finally:
+        database.DB_FILE = original_db_file
+
 def main():
     """Run all tests"""
     logger.info("Starting database tests...")
@@ -93,6 +385,31 @@ def main():
     if not test_message_storage():
         logger.error("Message storage test failed")
         return False
+
+    # Test batched storage with duplicates
+    if not test_batched_duplicate_messages():
+        logger.error("Batched duplicate message test failed")
+        return False
+
+    # Test that an invalid message doesn't take the batch down with it
+    if not test_invalid_message_in_batch():
+        logger.error("Invalid message batch test failed")
+        return False
+
+    # Test the trigger-maintained message counters
+    if not test_message_counters():
+        logger.error("Message counter test failed")
+        return False
+
+    # Test day queries under a non-UTC timezone
+    if not test_day_query_in_local_timezone():
+        logger.error("Timezone day query test failed")
+        return False
+
+    # Test the created_at_us migration on a baseline database
+    if not test_created_at_us_migration():
+        logger.error("created_at_us migration test failed")
+        return False
     
     logger.info("All tests completed successfully")
     return True